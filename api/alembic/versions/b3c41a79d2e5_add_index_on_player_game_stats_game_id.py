@@ -0,0 +1,33 @@
+"""Add index on player_game_stats.game_id
+
+Revision ID: b3c41a79d2e5
+Revises: f8fe877502a7
+Create Date: 2026-09-01 21:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3c41a79d2e5'
+down_revision: Union[str, Sequence[str], None] = 'f8fe877502a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Matches the index declared on the PlayerGameStats model; create_all
+    # won't add it to tables that already exist, so existing databases get
+    # it here
+    op.create_index(
+        'ix_player_game_stats_game_id', 'player_game_stats', ['game_id']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_player_game_stats_game_id', table_name='player_game_stats')
@@ -0,0 +1,13 @@
+"""
+Make nb_analyzer importable when scripts run straight from a checkout.
+
+With `pip install -e api/` the package resolves normally and this module does
+nothing; otherwise it falls back to the src/ layout next to scripts/.
+"""
+import sys
+from pathlib import Path
+
+try:
+    import nb_analyzer  # noqa: F401
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
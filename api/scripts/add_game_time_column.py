@@ -1,10 +1,8 @@
 """
 Add game_time column to games table.
 """
-import sys
-from pathlib import Path
 
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+import _bootstrap  # noqa: F401  # makes nb_analyzer importable from a checkout
 
 from nb_analyzer.database import SessionLocal, engine
 from sqlalchemy import text
@@ -7,90 +7,151 @@ today's potentially live games as completed. Today's games should be handled
 by the regular fetch_todays_games.py script which properly checks game status.
 """
 import sys
-from datetime import date, timedelta
-from pathlib import Path
+from datetime import date, datetime, timedelta
 
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+import _bootstrap  # noqa: F401  # makes nb_analyzer importable from a checkout
 
 from nba_api.stats.endpoints import leaguegamefinder
+from sqlalchemy import insert, update
+
 from nb_analyzer.database import SessionLocal, init_db
 from nb_analyzer.models import Game
+from nba_api_utils import call_with_backoff
+
+
+def season_for_date(d: date) -> str:
+    """NBA season string (e.g. '2025-26') for a given date."""
+    if d.month >= 10:
+        return f"{d.year}-{str(d.year + 1)[2:]}"
+    return f"{d.year - 1}-{str(d.year)[2:]}"
+
+
+def backfill_scores_batch(start_date: date, end_date: date, insert_missing: bool = False):
+    """
+    Backfill scores for a date range using LeagueGameFinder.
 
+    Args:
+        start_date: First day of the range (inclusive)
+        end_date: Last day of the range (inclusive)
+        insert_missing: Also insert games the database doesn't have yet,
+            instead of only updating scores on existing rows
 
-def backfill_scores_batch(start_date: date, end_date: date):
-    """Backfill scores for a date range using LeagueGameFinder."""
+    Returns:
+        Tuple of (games_updated, games_added).
+    """
     print(f"Fetching games from {start_date} to {end_date}...")
 
     # LeagueGameFinder returns all games in the range
-    games = leaguegamefinder.LeagueGameFinder(
+    games = call_with_backoff(
+        leaguegamefinder.LeagueGameFinder,
         season_nullable='2025-26',
         season_type_nullable='Regular Season',
         date_from_nullable=start_date.strftime('%m/%d/%Y'),
-        date_to_nullable=end_date.strftime('%m/%d/%Y')
+        date_to_nullable=end_date.strftime('%m/%d/%Y'),
     )
 
     df = games.get_data_frames()[0]
     print(f"Found {len(df)} team-game records ({len(df)//2} games)")
 
     if df.empty:
-        return 0
+        return 0, 0
 
     init_db()
     db = SessionLocal()
 
     updated = 0
-
-    # Group by game_id to process each game once
-    game_ids = df['GAME_ID'].unique()
-
-    for game_id_str in game_ids:
+    added = 0
+
+    # Project down to the columns we actually read — the raw frame carries
+    # ~30 columns we'd otherwise drag through every pandas op below
+    df = df[['GAME_ID', 'GAME_DATE', 'TEAM_ID', 'MATCHUP', 'PTS', 'WL']].copy()
+    df['PTS'] = df['PTS'].astype('Int32')
+
+    # Vectorized home/away flags: two linear scans over the whole DataFrame
+    # instead of two .str.contains scans per game
+    df['IS_HOME'] = df['MATCHUP'].str.contains('vs.', na=False, regex=False)
+    df['IS_AWAY'] = df['MATCHUP'].str.contains('@', na=False, regex=False)
+
+    # Preload all target games in one IN-clause query instead of one SELECT per game
+    existing_games = {
+        g.id: g
+        for g in db.query(Game).filter(
+            Game.id.in_([int(gid) for gid in df['GAME_ID'].unique()])
+        ).all()
+    }
+
+    score_updates = []
+    new_rows = []
+
+    # Single groupby pass instead of re-filtering the DataFrame per game_id
+    for game_id_str, game_records in df.groupby('GAME_ID', sort=False):
         # Convert to int (remove leading 00)
         game_id = int(game_id_str)
 
-        # Get both team records for this game
-        game_records = df[df['GAME_ID'] == game_id_str]
-
         if len(game_records) < 2:
             print(f"  Skipping {game_id_str}: only {len(game_records)} team record(s)")
             continue
 
         # Find home and away teams
-        home_records = game_records[game_records['MATCHUP'].str.contains('vs.', na=False)]
-        away_records = game_records[game_records['MATCHUP'].str.contains('@', na=False)]
+        home_records = game_records[game_records['IS_HOME']]
+        away_records = game_records[game_records['IS_AWAY']]
 
         if home_records.empty or away_records.empty:
             print(f"  Skipping {game_id_str}: couldn't identify home/away")
             continue
 
-        home_record = home_records.iloc[0]
-        away_record = away_records.iloc[0]
+        home_record = next(home_records.itertuples(index=False))
+        away_record = next(away_records.itertuples(index=False))
 
-        home_score = int(home_record['PTS'])
-        away_score = int(away_record['PTS'])
+        home_score = int(home_record.PTS)
+        away_score = int(away_record.PTS)
 
         # Check if game is actually completed (W/L means final)
         # Games in progress won't have W/L designation
-        is_final = home_record['WL'] in ['W', 'L'] and away_record['WL'] in ['W', 'L']
+        is_final = home_record.WL in ['W', 'L'] and away_record.WL in ['W', 'L']
 
         # Update in database
-        existing = db.query(Game).filter(Game.id == game_id).first()
+        existing = existing_games.get(game_id)
 
         if existing:
-            # Update scores regardless, but only mark completed if actually final
-            existing.home_score = home_score
-            existing.away_score = away_score
+            # Update scores regardless, but only mark completed if actually final.
+            # Not-final games get is_completed=False so live games are never stuck completed.
             if is_final and not existing.is_completed:
-                existing.is_completed = True
                 updated += 1
-            elif not is_final:
-                # Make sure live games aren't marked completed
-                existing.is_completed = False
+            score_updates.append({
+                "id": game_id,
+                "home_score": home_score,
+                "away_score": away_score,
+                "is_completed": is_final,
+            })
+        elif insert_missing:
+            game_date = datetime.strptime(home_record.GAME_DATE, "%Y-%m-%d").date()
+            new_rows.append({
+                "id": game_id,
+                "date": game_date,
+                "season": season_for_date(game_date),
+                "home_team_id": int(home_record.TEAM_ID),
+                "away_team_id": int(away_record.TEAM_ID),
+                "home_score": home_score,
+                "away_score": away_score,
+                "is_completed": is_final,
+            })
+            added += 1
+
+    if score_updates:
+        # Single bulk UPDATE by primary key instead of per-row attribute mutation
+        db.execute(update(Game), score_updates)
+    if new_rows:
+        db.execute(insert(Game), new_rows)
 
     db.commit()
     db.close()
 
-    print(f"Updated {updated} games")
-    return updated
+    if insert_missing:
+        print(f"Updated {updated} games, added {added} games")
+    else:
+        print(f"Updated {updated} games")
+    return updated, added
 
 
 def backfill_season():
@@ -117,19 +178,14 @@ def backfill_season():
         batch_end = min(next_month - timedelta(days=1), end_date)
 
         try:
-            updated = backfill_scores_batch(current, batch_end)
+            updated, _ = backfill_scores_batch(current, batch_end)
             total_updated += updated
         except Exception as e:
             print(f"Error processing {current} to {batch_end}: {e}")
 
-        # Move to next month
+        # Move to next month; backoff on throttling is handled per-request
         current = next_month
 
-        # Small delay between batches
-        if current <= end_date:
-            import time
-            time.sleep(1)
-
     print(f"\n✅ Backfill complete! Updated {total_updated} games total")
 
 
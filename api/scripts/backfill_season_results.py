@@ -1,14 +1,15 @@
 """
 Backfill game results for the 2025-26 season.
-Fetches all games from season start (Oct 22, 2025) through today.
+Fetches all games from season start (Oct 22, 2025) through today in monthly
+LeagueGameFinder date-range batches — a handful of API calls instead of one
+ScoreboardV2 call per day.
 """
 import sys
 from datetime import date, timedelta
-from pathlib import Path
 
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+import _bootstrap  # noqa: F401  # makes nb_analyzer importable from a checkout
 
-from fetch_todays_games import fetch_todays_games
+from backfill_scores import backfill_scores_batch
 
 
 def backfill_season():
@@ -18,27 +19,32 @@ def backfill_season():
     end_date = date.today()
 
     print(f"Backfilling games from {start_date} to {end_date}")
-    print(f"This will take approximately {(end_date - start_date).days} API calls (about 1-2 minutes with delays)\n")
+    print("Using monthly date-range batches (one API call per month)\n")
 
-    current_date = start_date
-    days_processed = 0
+    total_added = 0
+    total_updated = 0
+
+    current = start_date
+
+    while current <= end_date:
+        # Calculate end of current month or end_date, whichever is earlier
+        if current.month == 12:
+            next_month = date(current.year + 1, 1, 1)
+        else:
+            next_month = date(current.year, current.month + 1, 1)
+
+        batch_end = min(next_month - timedelta(days=1), end_date)
 
-    while current_date <= end_date:
-        print(f"\n=== {current_date} ===")
         try:
-            fetch_todays_games(current_date)
-            days_processed += 1
+            updated, added = backfill_scores_batch(current, batch_end, insert_missing=True)
+            total_updated += updated
+            total_added += added
         except Exception as e:
-            print(f"Error on {current_date}: {e}")
-
-        current_date += timedelta(days=1)
+            print(f"Error processing {current} to {batch_end}: {e}")
 
-        # Small delay to be respectful to NBA API (0.6s between requests)
-        if current_date <= end_date:
-            import time
-            time.sleep(0.6)
+        current = next_month
 
-    print(f"\n✅ Backfill complete! Processed {days_processed} days")
+    print(f"\n✅ Backfill complete! Added {total_added} games, updated {total_updated} games")
 
 
 if __name__ == "__main__":
@@ -49,7 +55,7 @@ if __name__ == "__main__":
     args = parser.parse_args()
 
     if not args.yes:
-        confirm = input("This will backfill ~96 days of games. Continue? (y/n): ")
+        confirm = input("This will backfill the full 2025-26 season. Continue? (y/n): ")
         if confirm.lower() != 'y':
             print("Cancelled")
             sys.exit(0)
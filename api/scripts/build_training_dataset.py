@@ -3,11 +3,9 @@
 CLI script to build margin prediction training dataset.
 Run from api/ directory: ./venv/bin/python scripts/build_training_dataset.py
 """
-import sys
-from pathlib import Path
 
 # Add src to path
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+import _bootstrap  # noqa: F401  # makes nb_analyzer importable from a checkout
 
 from nb_analyzer.ml.dataset_builder import main
 
@@ -1,7 +1,5 @@
 """Quick script to check current game score from NBA API."""
-import sys
-from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+import _bootstrap  # noqa: F401  # makes nb_analyzer importable from a checkout
 
 from nba_api.stats.endpoints import scoreboardv2
 
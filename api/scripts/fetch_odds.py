@@ -3,12 +3,15 @@ Fetch current betting odds from The Odds API and store in database.
 """
 import sys
 import os
-from pathlib import Path
+import re
 from datetime import datetime
+from pathlib import Path
+from zoneinfo import ZoneInfo
 import requests
 from dotenv import load_dotenv
+from sqlalchemy import insert
 
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+import _bootstrap  # noqa: F401  # makes nb_analyzer importable from a checkout
 
 from nb_analyzer.database import SessionLocal, init_db
 from nb_analyzer.models import Game, Team, GameOdds
@@ -17,6 +20,24 @@ from nb_analyzer.models import Game, Team, GameOdds
 load_dotenv()
 ODDS_API_KEY = os.getenv("ODDS_API_KEY")
 
+EASTERN = ZoneInfo("America/New_York")
+
+# Last seen upstream ETag, for conditional GETs on the frequent refresh path
+ETAG_PATH = Path(__file__).parent.parent / ".cache" / "last_odds_etag"
+
+# Odds API team names that don't normalize to our Team.name values
+TEAM_NAME_ALIASES = {
+    "laclippers": "losangelesclippers",
+    "lalakers": "losangeleslakers",
+    "nyknicks": "newyorkknicks",
+    "gswarriors": "goldenstatewarriors",
+}
+
+
+def normalize_team_name(name: str) -> str:
+    """Lowercase and strip non-letters so branding variants still match."""
+    return re.sub(r"[^a-z]+", "", name.lower())
+
 def fetch_nba_odds():
     """Fetch NBA odds from The Odds API."""
     url = "https://api.the-odds-api.com/v4/sports/basketball_nba/odds/"
@@ -27,14 +48,31 @@ def fetch_nba_odds():
         "oddsFormat": "american",
     }
 
+    # Conditional GET: if upstream odds haven't changed since last fetch,
+    # a 304 lets us skip the parse and the whole DB refresh
+    headers = {}
+    if ETAG_PATH.exists():
+        etag = ETAG_PATH.read_text().strip()
+        if etag:
+            headers["If-None-Match"] = etag
+
     print(f"Fetching odds from The Odds API...")
-    response = requests.get(url, params=params)
+    response = requests.get(url, params=params, headers=headers)
+
+    if response.status_code == 304:
+        print("✅ Odds unchanged upstream (ETag match) - nothing to update")
+        return None
 
     if response.status_code != 200:
         print(f"Error: {response.status_code}")
         print(response.text)
         return None
 
+    new_etag = response.headers.get("ETag")
+    if new_etag:
+        ETAG_PATH.parent.mkdir(exist_ok=True)
+        ETAG_PATH.write_text(new_etag)
+
     print(f"✅ Successfully fetched odds")
     print(f"Remaining requests: {response.headers.get('x-requests-remaining', 'unknown')}")
 
@@ -47,47 +85,63 @@ def store_odds_in_db(odds_data):
     db = SessionLocal()
 
     try:
-        # Get all teams for name matching
-        teams = {t.name: t for t in db.query(Team).all()}
+        # Get all teams for name matching, indexed by normalized name so
+        # Odds API variants ("LA Clippers") still hit ("Los Angeles Clippers")
+        teams = {normalize_team_name(t.name): t for t in db.query(Team).all()}
         stored_count = 0
         skipped_count = 0
 
+        def find_team(name: str) -> Team | None:
+            key = normalize_team_name(name)
+            return teams.get(TEAM_NAME_ALIASES.get(key, key))
+
+        # First pass: resolve teams and dates so games can be preloaded at once
+        resolved = []
         for game_data in odds_data:
             home_team_name = game_data["home_team"]
             away_team_name = game_data["away_team"]
 
             # Find matching teams
-            home_team = teams.get(home_team_name)
-            away_team = teams.get(away_team_name)
+            home_team = find_team(home_team_name)
+            away_team = find_team(away_team_name)
 
             if not home_team or not away_team:
                 print(f"  ⚠️  Skipping {away_team_name} @ {home_team_name} - teams not in database")
                 skipped_count += 1
                 continue
 
-            # Parse commence time (UTC) and convert to EST
+            # Parse commence time (UTC) and take the Eastern-time date;
+            # zoneinfo handles the EST/EDT offset so DST-edge games don't
+            # land on the wrong date
             commence_time_utc = datetime.fromisoformat(game_data["commence_time"].replace("Z", "+00:00"))
+            game_date = commence_time_utc.astimezone(EASTERN).date()
+
+            resolved.append((game_data, home_team, away_team, game_date))
+
+        # Preload all candidate games with one query instead of one per game
+        dates_seen = {game_date for _, _, _, game_date in resolved}
+        games_by_key = {
+            (g.home_team_id, g.away_team_id, g.date): g
+            for g in db.query(Game).filter(Game.date.in_(dates_seen)).all()
+        } if dates_seen else {}
 
-            # Convert to EST (UTC-5, or UTC-4 during DST)
-            # Simple approach: subtract 5 hours to get EST date
-            from datetime import timedelta
-            est_time = commence_time_utc - timedelta(hours=5)
-            game_date = est_time.date()
+        # Second pass: buffer all new odds rows, then refresh with one
+        # bulk DELETE and one bulk INSERT
+        game_ids_to_refresh = set()
+        new_odds_rows = []
+
+        for game_data, home_team, away_team, game_date in resolved:
+            home_team_name = game_data["home_team"]
+            away_team_name = game_data["away_team"]
 
-            # Find or create game
-            game = db.query(Game).filter(
-                Game.home_team_id == home_team.id,
-                Game.away_team_id == away_team.id,
-                Game.date == game_date
-            ).first()
+            game = games_by_key.get((home_team.id, away_team.id, game_date))
 
             if not game:
                 print(f"  ⚠️  No game found for {away_team_name} @ {home_team_name} on {game_date}")
                 skipped_count += 1
                 continue
 
-            # Delete existing odds for this game (to refresh with latest)
-            db.query(GameOdds).filter(GameOdds.game_id == game.id).delete()
+            game_ids_to_refresh.add(game.id)
 
             # Process each bookmaker
             for bookmaker in game_data.get("bookmakers", []):
@@ -97,43 +151,59 @@ def store_odds_in_db(odds_data):
                 for market in bookmaker["markets"]:
                     market_type = market["key"]
 
-                    odds_record = GameOdds(
-                        game_id=game.id,
-                        bookmaker=bookmaker_key,
-                        market_type=market_type,
-                        last_update=last_update,
-                    )
+                    odds_row = {
+                        "game_id": game.id,
+                        "bookmaker": bookmaker_key,
+                        "market_type": market_type,
+                        "last_update": last_update,
+                        "home_line": None,
+                        "home_odds": None,
+                        "away_line": None,
+                        "away_odds": None,
+                        "over_line": None,
+                        "over_odds": None,
+                        "under_line": None,
+                        "under_odds": None,
+                    }
 
                     if market_type == "spreads":
                         for outcome in market["outcomes"]:
                             if outcome["name"] == home_team_name:
-                                odds_record.home_line = outcome["point"]
-                                odds_record.home_odds = outcome["price"]
+                                odds_row["home_line"] = outcome["point"]
+                                odds_row["home_odds"] = outcome["price"]
                             elif outcome["name"] == away_team_name:
-                                odds_record.away_line = outcome["point"]
-                                odds_record.away_odds = outcome["price"]
+                                odds_row["away_line"] = outcome["point"]
+                                odds_row["away_odds"] = outcome["price"]
 
                     elif market_type == "totals":
                         for outcome in market["outcomes"]:
                             if outcome["name"] == "Over":
-                                odds_record.over_line = outcome["point"]
-                                odds_record.over_odds = outcome["price"]
+                                odds_row["over_line"] = outcome["point"]
+                                odds_row["over_odds"] = outcome["price"]
                             elif outcome["name"] == "Under":
-                                odds_record.under_line = outcome["point"]
-                                odds_record.under_odds = outcome["price"]
+                                odds_row["under_line"] = outcome["point"]
+                                odds_row["under_odds"] = outcome["price"]
 
                     elif market_type == "h2h":  # moneyline
                         for outcome in market["outcomes"]:
                             if outcome["name"] == home_team_name:
-                                odds_record.home_odds = outcome["price"]
+                                odds_row["home_odds"] = outcome["price"]
                             elif outcome["name"] == away_team_name:
-                                odds_record.away_odds = outcome["price"]
+                                odds_row["away_odds"] = outcome["price"]
 
-                    db.add(odds_record)
+                    new_odds_rows.append(odds_row)
                     stored_count += 1
 
             print(f"  ✅ Stored odds for {away_team.abbreviation} @ {home_team.abbreviation}")
 
+        # Refresh odds for all matched games in one delete + one insert
+        if game_ids_to_refresh:
+            db.query(GameOdds).filter(
+                GameOdds.game_id.in_(game_ids_to_refresh)
+            ).delete(synchronize_session=False)
+        if new_odds_rows:
+            db.execute(insert(GameOdds), new_odds_rows)
+
         db.commit()
         print(f"\n✅ Successfully stored {stored_count} odds records")
         print(f"⚠️  Skipped {skipped_count} games (not in database)")
@@ -146,7 +216,8 @@ def store_odds_in_db(odds_data):
         db.close()
 
 
-if __name__ == "__main__":
+def main():
+    """Fetch current odds and store them (callable from run_ops in-process)."""
     if not ODDS_API_KEY:
         print("❌ Error: ODDS_API_KEY not found in .env file")
         sys.exit(1)
@@ -156,3 +227,7 @@ if __name__ == "__main__":
     if odds_data:
         print(f"\nFound odds for {len(odds_data)} games\n")
         store_odds_in_db(odds_data)
+
+
+if __name__ == "__main__":
+    main()
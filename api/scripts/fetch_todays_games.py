@@ -1,50 +1,60 @@
 """
 Fetch today's scheduled games from the NBA API.
 """
-import sys
+import re
 from datetime import date, datetime
-from pathlib import Path
-from zoneinfo import ZoneInfo
 
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+import pandas as pd
+
+import _bootstrap  # noqa: F401  # makes nb_analyzer importable from a checkout
 
 from nba_api.stats.endpoints import scoreboardv2
+from sqlalchemy import update
 
-from nb_analyzer.database import SessionLocal, init_db
+from nb_analyzer.database import SessionLocal, dialect_insert, init_db
 from nb_analyzer.models import Game, Team
+from nba_api_utils import call_with_backoff
 
 
-def parse_game_time(game_status_text: str, game_date: date) -> datetime | None:
-    """Parse game start time from status text (e.g., '7:30 pm ET') and convert to UTC."""
-    if not game_status_text or ('pm' not in game_status_text.lower() and 'am' not in game_status_text.lower()):
-        return None
+def parse_game_times(status_text: pd.Series, game_date: date) -> list[datetime | None]:
+    """
+    Parse game start times from status text (e.g., '7:30 pm ET') and convert to UTC.
 
-    try:
-        # Extract time string (e.g., "7:30 pm ET" or "7:00 pm ET")
-        time_str = game_status_text.strip()
-        # Remove timezone indicator for parsing
-        time_str = time_str.replace(' ET', '').replace(' EST', '').replace(' EDT', '').strip()
-        # Parse the time
-        game_time = datetime.strptime(time_str, "%I:%M %p")
-        # Combine with the game date
-        full_datetime = datetime.combine(game_date, game_time.time())
-        # Localize to Eastern Time
-        et_datetime = full_datetime.replace(tzinfo=ZoneInfo("America/New_York"))
-        # Convert to UTC
-        utc_datetime = et_datetime.astimezone(ZoneInfo("UTC"))
-        # Return as naive UTC datetime for SQLite storage
-        return utc_datetime.replace(tzinfo=None)
-    except Exception as e:
-        # Silently fail - game time is optional
-        return None
+    Vectorized over the whole GAME_STATUS_TEXT column — one C-level
+    to_datetime pass instead of a Python strptime per row. Rows without a
+    start time (live/final status text) come back as None.
+    """
+    # Extract the clock portion; non-matching rows become NaT below
+    clock = status_text.str.extract(r'(\d{1,2}:\d{2}\s*[ap]m)', flags=re.IGNORECASE)[0]
+    parsed = pd.to_datetime(clock, format="%I:%M %p", errors="coerce")
+
+    # Anchor the parsed clock times (dated 1900-01-01) to the game date,
+    # localize to Eastern Time, and convert to naive UTC for SQLite storage
+    anchored = parsed - pd.Timestamp("1900-01-01") + pd.Timestamp(game_date)
+    utc_times = (
+        anchored
+        .dt.tz_localize("America/New_York", nonexistent="NaT", ambiguous="NaT")
+        .dt.tz_convert("UTC")
+        .dt.tz_localize(None)
+    )
+
+    # `t is pd.NaT` beats a pd.isna type-dispatch per scalar
+    return [None if t is pd.NaT else t.to_pydatetime() for t in utc_times]
 
 
-def fetch_todays_games(game_date: date = None):
+def fetch_todays_games(game_date: date = None, scoreboard=None, teams: dict[int, str] | None = None):
     """
     Fetch today's games from the NBA scoreboard.
 
     Args:
         game_date: Date to fetch games for (defaults to today)
+        scoreboard: Optional prefetched ScoreboardV2 for this date, so callers
+            can fan out the API calls and keep database writes sequential
+        teams: Optional team id -> abbreviation mapping, so multi-day callers
+            don't re-query the teams table on every call
+
+    Returns:
+        Tuple of (games_added, games_updated).
     """
     if game_date is None:
         game_date = date.today()
@@ -57,17 +67,36 @@ def fetch_todays_games(game_date: date = None):
         date_str = game_date.strftime("%m/%d/%Y")
         print(f"Fetching games for {game_date} ({date_str})...")
 
-        scoreboard = scoreboardv2.ScoreboardV2(game_date=date_str)
-        games_df = scoreboard.get_data_frames()[0]  # GameHeader
+        if scoreboard is None:
+            scoreboard = call_with_backoff(scoreboardv2.ScoreboardV2, game_date=date_str)
+
+        # Parse the payload once: GameHeader + LineScore
+        frames = scoreboard.get_data_frames()
+        games_df = frames[0]
 
         if games_df.empty:
             print("No games scheduled for this date.")
-            return
+            return 0, 0
 
         print(f"Found {len(games_df)} games")
 
-        # Get team abbreviation to ID mapping
-        teams = {t.id: t.abbreviation for t in db.query(Team).all()}
+        # Parse all game start times in one vectorized pass
+        if "GAME_STATUS_TEXT" in games_df:
+            game_times = parse_game_times(games_df["GAME_STATUS_TEXT"], game_date)
+        else:
+            game_times = [None] * len(games_df)
+
+        # Index line scores by team once instead of boolean-masking per row
+        line_score_df = frames[1]
+        pts_by_team = {
+            int(team_id): int(pts)
+            for team_id, pts in zip(line_score_df["TEAM_ID"], line_score_df["PTS"])
+            if pts is not None and pts == pts  # self-equality is False only for NaN
+        }
+
+        # Get team abbreviation to ID mapping (unless the caller already has it)
+        if teams is None:
+            teams = {t.id: t.abbreviation for t in db.query(Team).all()}
 
         # Determine current season
         if game_date.month >= 10:
@@ -78,8 +107,10 @@ def fetch_todays_games(game_date: date = None):
         games_added = 0
         games_updated = 0
         seen_game_ids = set()
+        rows = []
 
-        for _, row in games_df.iterrows():
+        # to_dict('records') avoids constructing a Series per row like iterrows does
+        for row, game_time in zip(games_df.to_dict("records"), game_times):
             game_id = int(row["GAME_ID"])
 
             # Skip duplicates in the API response
@@ -94,63 +125,74 @@ def fetch_todays_games(game_date: date = None):
             game_status = row.get("GAME_STATUS_ID", 1)
             is_completed = game_status == 3  # 3 = Final
 
-            # Parse game time from status text
-            game_status_text = row.get("GAME_STATUS_TEXT", "")
-            game_time = parse_game_time(game_status_text, game_date)
-
             # Get scores if available
             home_score = None
             away_score = None
             if is_completed or game_status == 2:  # 2 = In Progress
-                # Scores are in the line score dataframe
-                line_score_df = scoreboard.get_data_frames()[1]
-                home_line = line_score_df[line_score_df["TEAM_ID"] == home_team_id]
-                away_line = line_score_df[line_score_df["TEAM_ID"] == away_team_id]
-                if not home_line.empty and home_line["PTS"].notna().values[0]:
-                    home_score = int(home_line["PTS"].values[0])
-                if not away_line.empty and away_line["PTS"].notna().values[0]:
-                    away_score = int(away_line["PTS"].values[0])
-
-            # Check if game exists
-            existing = db.query(Game).filter(Game.id == game_id).first()
+                home_score = pts_by_team.get(home_team_id)
+                away_score = pts_by_team.get(away_team_id)
+
+            rows.append({
+                "id": game_id,
+                "date": game_date,
+                "game_time": game_time,
+                "season": season,
+                "home_team_id": home_team_id,
+                "away_team_id": away_team_id,
+                "home_score": home_score,
+                "away_score": away_score,
+                "is_completed": is_completed,
+            })
+
+        # Preload existing games with one IN-clause query, then partition the
+        # day's rows into one bulk INSERT and one bulk UPDATE by primary key
+        existing_games = {
+            g.id: g
+            for g in db.query(Game).filter(Game.id.in_([r["id"] for r in rows])).all()
+        }
+
+        new_rows = []
+        update_rows = []
+
+        for r in rows:
+            existing = existing_games.get(r["id"])
 
             if existing:
                 # Update if scores changed or time info available
                 needs_update = (
-                    existing.home_score != home_score or
-                    existing.away_score != away_score or
-                    existing.is_completed != is_completed or
-                    (game_time and existing.game_time != game_time)
+                    existing.home_score != r["home_score"] or
+                    existing.away_score != r["away_score"] or
+                    existing.is_completed != r["is_completed"] or
+                    (r["game_time"] and existing.game_time != r["game_time"])
                 )
                 if needs_update:
-                    existing.home_score = home_score
-                    existing.away_score = away_score
-                    existing.is_completed = is_completed
-                    if game_time:
-                        existing.game_time = game_time
+                    update_rows.append({
+                        "id": r["id"],
+                        "home_score": r["home_score"],
+                        "away_score": r["away_score"],
+                        "is_completed": r["is_completed"],
+                        "game_time": r["game_time"] or existing.game_time,
+                    })
                     games_updated += 1
-                    print(f"  Updated: {teams.get(away_team_id, '?')} @ {teams.get(home_team_id, '?')} - {away_score or '?'}-{home_score or '?'}")
+                    print(f"  Updated: {teams.get(r['away_team_id'], '?')} @ {teams.get(r['home_team_id'], '?')} - {r['away_score'] or '?'}-{r['home_score'] or '?'}")
             else:
-                # Add new game
-                game = Game(
-                    id=game_id,
-                    date=game_date,
-                    game_time=game_time,
-                    season=season,
-                    home_team_id=home_team_id,
-                    away_team_id=away_team_id,
-                    home_score=home_score,
-                    away_score=away_score,
-                    is_completed=is_completed,
-                )
-                db.add(game)
+                new_rows.append(r)
                 games_added += 1
-                status = "Final" if is_completed else "Scheduled"
-                time_info = f" at {game_time.strftime('%I:%M %p')}" if game_time else ""
-                print(f"  Added: {teams.get(away_team_id, '?')} @ {teams.get(home_team_id, '?')} [{status}]{time_info}")
+                status = "Final" if r["is_completed"] else "Scheduled"
+                time_info = f" at {r['game_time'].strftime('%I:%M %p')}" if r["game_time"] else ""
+                print(f"  Added: {teams.get(r['away_team_id'], '?')} @ {teams.get(r['home_team_id'], '?')} [{status}]{time_info}")
+
+        if new_rows:
+            # ON CONFLICT DO NOTHING: concurrent writers (e.g. the upcoming
+            # fetch and the scores update both covering today) can race on
+            # the same new game without one side's whole day rolling back
+            db.execute(dialect_insert(Game).on_conflict_do_nothing(), new_rows)
+        if update_rows:
+            db.execute(update(Game), update_rows)
 
         db.commit()
         print(f"\nAdded {games_added} new games, updated {games_updated} games")
+        return games_added, games_updated
 
     except Exception as e:
         db.rollback()
@@ -3,13 +3,23 @@ Fetch upcoming games for the next 14 days from the NBA API.
 This ensures the weekly view always has games available.
 Runs daily via cron.
 """
-import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, timedelta
-from pathlib import Path
 
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+import _bootstrap  # noqa: F401  # makes nb_analyzer importable from a checkout
+
+from nba_api.stats.endpoints import scoreboardv2
+
+from nb_analyzer.database import SessionLocal, init_db
+from nb_analyzer.models import Team
 
 from fetch_todays_games import fetch_todays_games
+from nba_api_utils import call_with_backoff, default_pool_size
+
+
+def _fetch_scoreboard(game_date: date):
+    """Fetch the ScoreboardV2 for a single date (safe to run in a worker thread)."""
+    return call_with_backoff(scoreboardv2.ScoreboardV2, game_date=game_date.strftime("%m/%d/%Y"))
 
 
 def fetch_upcoming_games():
@@ -21,37 +31,35 @@ def fetch_upcoming_games():
     total_added = 0
     total_updated = 0
 
-    for days_ahead in range(14):
-        game_date = date.today() + timedelta(days=days_ahead)
-
-        try:
-            print(f"\n📅 {game_date.strftime('%A, %B %d, %Y')}")
-            print("-" * 60)
-
-            # Capture output to count adds/updates
-            import io
-            import contextlib
-
-            f = io.StringIO()
-            with contextlib.redirect_stdout(f):
-                fetch_todays_games(game_date)
-
-            output = f.getvalue()
-            print(output, end='')
-
-            # Parse results
-            if "Added" in output:
-                line = [l for l in output.split('\n') if 'Added' in l and 'new games' in l]
-                if line:
-                    parts = line[0].split()
-                    added = int(parts[1])
-                    updated = int(parts[5])
-                    total_added += added
-                    total_updated += updated
-
-        except Exception as e:
-            print(f"❌ Error fetching {game_date}: {e}")
-            continue
+    # Query the team mapping once for all 14 days
+    init_db()
+    db = SessionLocal()
+    try:
+        teams = {t.id: t.abbreviation for t in db.query(Team).all()}
+    finally:
+        db.close()
+
+    dates = [date.today() + timedelta(days=days_ahead) for days_ahead in range(14)]
+
+    # Fan out the 14 scoreboard fetches across threads (the slow part is
+    # waiting on the NBA API), then apply database writes sequentially.
+    with ThreadPoolExecutor(max_workers=default_pool_size(cap=4)) as pool:
+        futures = {game_date: pool.submit(_fetch_scoreboard, game_date) for game_date in dates}
+
+        for game_date in dates:
+            try:
+                print(f"\n📅 {game_date.strftime('%A, %B %d, %Y')}")
+                print("-" * 60)
+
+                added, updated = fetch_todays_games(
+                    game_date, scoreboard=futures[game_date].result(), teams=teams
+                )
+                total_added += added
+                total_updated += updated
+
+            except Exception as e:
+                print(f"❌ Error fetching {game_date}: {e}")
+                continue
 
     print("\n" + "=" * 60)
     print(f"✅ Fetch complete!")
@@ -1,12 +1,9 @@
 """
 Fetch games for the next week from the NBA API.
 """
-import sys
 from datetime import date, timedelta
-from pathlib import Path
 
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
-sys.path.insert(0, str(Path(__file__).parent))
+import _bootstrap  # noqa: F401  # makes nb_analyzer importable from a checkout
 
 from fetch_todays_games import fetch_todays_games
 
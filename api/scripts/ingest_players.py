@@ -1,17 +1,22 @@
 """
 Fetch NBA players and store them in the database.
 """
-import sys
-import time
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+import _bootstrap  # noqa: F401  # makes nb_analyzer importable from a checkout
 
 from nba_api.stats.static import players as nba_players
 from nba_api.stats.endpoints import commonplayerinfo
 
+from nb_analyzer.constants import TEAM_ABBREV_TO_ID
 from nb_analyzer.database import SessionLocal, init_db
-from nb_analyzer.models import Player, Team
+from nb_analyzer.models import Player
+from nba_api_utils import call_with_backoff, default_pool_size, install_response_cache
+
+
+def fetch_player_info(player_id: int):
+    """Fetch CommonPlayerInfo for one player (runs in a worker thread)."""
+    return call_with_backoff(commonplayerinfo.CommonPlayerInfo, player_id=player_id)
 
 
 def ingest_players(active_only: bool = True):
@@ -21,6 +26,9 @@ def ingest_players(active_only: bool = True):
     Args:
         active_only: If True, only fetch currently active players
     """
+    # Player bios change rarely; serve re-runs from the on-disk cache
+    install_response_cache()
+
     init_db()
     db = SessionLocal()
 
@@ -32,58 +40,65 @@ def ingest_players(active_only: bool = True):
 
         print(f"Found {len(all_players)} {'active ' if active_only else ''}players")
 
-        # Get team abbreviation to ID mapping
-        teams = {t.abbreviation: t.id for t in db.query(Team).all()}
+        # Static team abbreviation -> ID mapping; no DB query needed, and the
+        # player ingest no longer depends on a populated Team table
+        teams = TEAM_ABBREV_TO_ID
 
-        for i, player_data in enumerate(all_players):
-            player_id = player_data["id"]
+        # One id query up front instead of an existence SELECT per player
+        existing_ids = {pid for (pid,) in db.query(Player.id).all()}
 
-            # Check if player already exists
-            existing = db.query(Player).filter(Player.id == player_id).first()
-
-            if existing:
-                print(f"  [{i+1}/{len(all_players)}] Player {player_data['full_name']} exists, skipping")
+        # Figure out who's new first, so only they get a detail fetch
+        to_ingest = []
+        for player_data in all_players:
+            if player_data["id"] in existing_ids:
+                print(f"  Player {player_data['full_name']} exists, skipping")
                 continue
-
-            # Get detailed player info for team and position
-            # Rate limit to avoid hitting NBA API limits
-            if i > 0 and i % 10 == 0:
-                time.sleep(1)
-
-            try:
-                player_info = commonplayerinfo.CommonPlayerInfo(player_id=player_id)
-                info_df = player_info.get_data_frames()[0]
-
-                if not info_df.empty:
-                    row = info_df.iloc[0]
-                    team_abbrev = row.get("TEAM_ABBREVIATION", "")
-                    team_id = teams.get(team_abbrev)
-                    position = row.get("POSITION", None)
-                else:
+            to_ingest.append(player_data)
+
+        print(f"  {len(to_ingest)} new players to add")
+
+        # Fan the CommonPlayerInfo fetches out across a bounded worker pool;
+        # the pool size caps concurrent requests against the NBA API, so the
+        # fixed every-10-players sleep is no longer needed
+        with ThreadPoolExecutor(max_workers=default_pool_size()) as pool:
+            futures = {p["id"]: pool.submit(fetch_player_info, p["id"]) for p in to_ingest}
+
+            for i, player_data in enumerate(to_ingest):
+                player_id = player_data["id"]
+
+                try:
+                    info_df = futures[player_id].result().get_data_frames()[0]
+
+                    if not info_df.empty:
+                        row = info_df.iloc[0]
+                        team_abbrev = row.get("TEAM_ABBREVIATION", "")
+                        team_id = teams.get(team_abbrev)
+                        position = row.get("POSITION", None)
+                    else:
+                        team_id = None
+                        position = None
+                except Exception as e:
+                    print(f"    Warning: Could not fetch details for {player_data['full_name']}: {e}")
                     team_id = None
                     position = None
-            except Exception as e:
-                print(f"    Warning: Could not fetch details for {player_data['full_name']}: {e}")
-                team_id = None
-                position = None
-
-            player = Player(
-                id=player_id,
-                name=player_data["full_name"],
-                team_id=team_id,
-                position=position,
-                is_active=player_data.get("is_active", True),
-            )
-            db.add(player)
-            print(f"  [{i+1}/{len(all_players)}] Added: {player.name}")
-
-            # Commit in batches
-            if (i + 1) % 50 == 0:
-                db.commit()
-                print(f"  Committed batch ({i+1} players)")
+
+                player = Player(
+                    id=player_id,
+                    name=player_data["full_name"],
+                    team_id=team_id,
+                    position=position,
+                    is_active=player_data.get("is_active", True),
+                )
+                db.add(player)
+                print(f"  [{i+1}/{len(to_ingest)}] Added: {player.name}")
+
+                # Commit in batches
+                if (i + 1) % 50 == 0:
+                    db.commit()
+                    print(f"  Committed batch ({i+1} players)")
 
         db.commit()
-        print(f"\nSuccessfully ingested {len(all_players)} players")
+        print(f"\nSuccessfully ingested {len(to_ingest)} new players")
 
     except Exception as e:
         db.rollback()
@@ -1,15 +1,13 @@
 """
 Fetch all NBA teams and store them in the database.
 """
-import sys
-from pathlib import Path
 
 # Add src to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+import _bootstrap  # noqa: F401  # makes nb_analyzer importable from a checkout
 
 from nba_api.stats.static import teams as nba_teams
 
-from nb_analyzer.database import SessionLocal, init_db
+from nb_analyzer.database import SessionLocal, dialect_insert, init_db
 from nb_analyzer.models import Team
 
 
@@ -57,30 +55,35 @@ def ingest_teams():
         all_teams = nba_teams.get_teams()
         print(f"Found {len(all_teams)} NBA teams")
 
+        rows = []
         for team_data in all_teams:
             abbrev = team_data["abbreviation"]
             team_info = TEAM_INFO.get(abbrev, {"conference": "Unknown", "division": "Unknown"})
 
-            # Check if team already exists
-            existing = db.query(Team).filter(Team.id == team_data["id"]).first()
-            if existing:
-                print(f"  Team {abbrev} already exists, updating...")
-                existing.name = team_data["full_name"]
-                existing.abbreviation = abbrev
-                existing.city = team_data["city"]
-                existing.conference = team_info["conference"]
-                existing.division = team_info["division"]
-            else:
-                team = Team(
-                    id=team_data["id"],
-                    name=team_data["full_name"],
-                    abbreviation=abbrev,
-                    city=team_data["city"],
-                    conference=team_info["conference"],
-                    division=team_info["division"],
-                )
-                db.add(team)
-                print(f"  Added team: {team.name}")
+            rows.append({
+                "id": team_data["id"],
+                "name": team_data["full_name"],
+                "abbreviation": abbrev,
+                "city": team_data["city"],
+                "conference": team_info["conference"],
+                "division": team_info["division"],
+            })
+            print(f"  Upserting team: {team_data['full_name']}")
+
+        # One idempotent UPSERT for all 30 teams: inserts new rows, refreshes
+        # existing ones, no per-team existence checks
+        stmt = dialect_insert(Team)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["id"],
+            set_={
+                "name": stmt.excluded.name,
+                "abbreviation": stmt.excluded.abbreviation,
+                "city": stmt.excluded.city,
+                "conference": stmt.excluded.conference,
+                "division": stmt.excluded.division,
+            },
+        )
+        db.execute(stmt, rows)
 
         db.commit()
         print(f"\nSuccessfully ingested {len(all_teams)} teams")
@@ -0,0 +1,89 @@
+"""
+Shared helpers for calling the NBA API politely.
+"""
+import os
+import random
+import time
+
+import requests
+
+
+def default_pool_size(cap: int = 8) -> int:
+    """
+    Thread-pool size for NBA API fan-outs.
+
+    Twice the CPUs this process is actually allowed to use (cgroup-aware
+    via sched_getaffinity, which matters on shared cron hosts), capped so
+    concurrency stays inside the API's rate budget.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        # Platforms without sched_getaffinity (e.g., macOS)
+        cpus = os.cpu_count() or 1
+    return max(1, min(cpus * 2, cap))
+
+
+def install_response_cache(cache_name: str = "nba_api_cache") -> bool:
+    """
+    Serve repeated NBA API responses from an on-disk SQLite cache.
+
+    Historical endpoints (past box scores, finished seasons) are immutable,
+    so re-runs after a crash or schema change become disk-bound instead of
+    network-bound. Only use this from scripts that fetch historical data —
+    it patches requests globally for the process. Returns False (and does
+    nothing) when requests-cache isn't installed.
+    """
+    try:
+        import requests_cache
+    except ImportError:
+        return False
+
+    requests_cache.install_cache(cache_name, backend="sqlite", expire_after=None)
+    return True
+
+
+def call_with_backoff(fn, *args, max_retries: int = 5, **kwargs):
+    """
+    Call an nba_api endpoint, backing off only when the API pushes back.
+
+    nba_api never calls raise_for_status(): a throttled or erroring response
+    comes back as an unparseable body, so the endpoint constructor raises a
+    JSON decode error (a ValueError) rather than requests.HTTPError. Treat
+    that — and transport errors like timeouts — as push-back and retry with
+    exponential backoff plus jitter. HTTPError is still handled (honoring
+    Retry-After) for callers that do raise on status.
+    """
+    delay = 1.0
+
+    for _ in range(max_retries):
+        try:
+            return fn(*args, **kwargs)
+        except requests.HTTPError as e:
+            response = e.response
+            status = response.status_code if response is not None else None
+
+            # Only throttling and server errors are worth retrying
+            if status != 429 and (status is None or status < 500):
+                raise
+
+            retry_after = response.headers.get("Retry-After") if response is not None else None
+            if retry_after:
+                wait = float(retry_after)
+            else:
+                wait = min(delay, 30.0) * (1 + random.random())
+                delay *= 2
+
+            print(f"  NBA API returned {status}, retrying in {wait:.1f}s...")
+            time.sleep(wait)
+        except (ValueError, requests.RequestException) as e:
+            # Throttled/blocked stats.nba.com responses surface here as JSON
+            # decode failures; timeouts and connection resets land here too
+            wait = min(delay, 30.0) * (1 + random.random())
+            delay *= 2
+
+            print(f"  NBA API request failed ({type(e).__name__}), retrying in {wait:.1f}s...")
+            time.sleep(wait)
+
+    # Last attempt propagates any error to the caller
+    return fn(*args, **kwargs)
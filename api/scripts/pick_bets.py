@@ -6,27 +6,59 @@ Uses margin predictions + market odds to calculate expected value
 for moneyline and spread bets, then recommends the best opportunity.
 """
 import sys
-from pathlib import Path
+from contextlib import closing
 from datetime import date, timedelta
 from typing import Optional
 from collections import Counter
 
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+import _bootstrap  # noqa: F401  # makes nb_analyzer importable from a checkout
 
+import numpy as np
+from sqlalchemy import and_, bindparam, case, func, select
 from sqlalchemy.orm import Session
 
 from nb_analyzer.database import SessionLocal, init_db
 from nb_analyzer.models import Game, Team, GameOdds
 from nb_analyzer.ml.margin_inference import MarginInference
 from nb_analyzer.ml.bet_selector import (
-    get_consensus_odds,
+    get_consensus_odds_batch,
     select_best_bet,
     BetRecommendation,
     DEFAULT_SIGMA
 )
 
 
-def diagnose_odds_coverage(db: Session, days: int = 3):
+# Built once at module level so every invocation reuses the same
+# bind-parameterized statement and hits the engine's compiled-query cache
+UPCOMING_GAMES_STMT = (
+    select(Game)
+    .where(
+        Game.date >= bindparam("start"),
+        Game.date <= bindparam("end"),
+        Game.is_completed == False,
+    )
+    .order_by(Game.date, Game.id)
+)
+
+# Column-only variant for the diagnostics, which only print scalar fields —
+# plain Row tuples skip per-row ORM materialization
+UPCOMING_GAME_ROWS_STMT = (
+    select(Game.id, Game.date, Game.home_team_id, Game.away_team_id)
+    .where(
+        Game.date >= bindparam("start"),
+        Game.date <= bindparam("end"),
+        Game.is_completed == False,
+    )
+    .order_by(Game.date, Game.id)
+)
+
+
+def get_teams_dict(db: Session) -> dict[int, Team]:
+    """Team id -> Team map, fetched once and shared across the run."""
+    return {t.id: t for t in db.query(Team).all()}
+
+
+def diagnose_odds_coverage(db: Session, days: int = 3, teams: dict[int, Team] | None = None):
     """
     Diagnose odds coverage issues.
 
@@ -39,24 +71,50 @@ def diagnose_odds_coverage(db: Session, days: int = 3):
     print(f"ODDS COVERAGE DIAGNOSTICS (Next {days} days)")
     print("="*90)
 
-    # Get upcoming games
-    upcoming_games = db.query(Game).filter(
-        Game.date >= today,
-        Game.date <= end_date,
-        Game.is_completed == False
-    ).order_by(Game.date, Game.id).all()
+    # Get upcoming games (Row tuples; nothing here needs Game instances)
+    upcoming_games = db.execute(
+        UPCOMING_GAME_ROWS_STMT, {"start": today, "end": end_date}
+    ).all()
 
     print(f"\nTotal upcoming games: {len(upcoming_games)}")
 
     # Get team info
-    teams = {t.id: t for t in db.query(Team).all()}
+    if teams is None:
+        teams = get_teams_dict(db)
+
+    # One grouped aggregate computes per-game market coverage inside the DB,
+    # so only (game_id, flags) tuples come back instead of every odds row
+    game_ids = [g.id for g in upcoming_games]
+    coverage = {}
+    if game_ids:
+        coverage_rows = db.execute(
+            select(
+                GameOdds.game_id,
+                func.max(case(
+                    (and_(GameOdds.market_type == 'spreads', GameOdds.home_line.isnot(None)), 1),
+                    else_=0,
+                )).label('has_spreads'),
+                func.max(case(
+                    (and_(
+                        GameOdds.market_type == 'h2h',
+                        GameOdds.home_odds.isnot(None),
+                        GameOdds.away_odds.isnot(None),
+                    ), 1),
+                    else_=0,
+                )).label('has_h2h'),
+                func.max(case((GameOdds.market_type == 'totals', 1), else_=0)).label('has_totals'),
+            )
+            .where(GameOdds.game_id.in_(game_ids))
+            .group_by(GameOdds.game_id)
+        ).all()
+        coverage = {row.game_id: row for row in coverage_rows}
 
     # Analyze odds coverage
     games_with_any_odds = 0
     games_with_spreads = 0
     games_with_h2h = 0
     games_with_totals = 0
-    no_odds_reasons = []
+    no_odds_reasons = Counter()
 
     print(f"\nAnalyzing odds for each game...")
     print("="*90)
@@ -70,24 +128,11 @@ def diagnose_odds_coverage(db: Session, days: int = 3):
 
         matchup = f"{away_team.abbreviation} @ {home_team.abbreviation}"
 
-        # Query all odds for this game
-        all_odds = db.query(GameOdds).filter(
-            GameOdds.game_id == game.id
-        ).all()
-
-        # Check spreads
-        spread_odds = [o for o in all_odds if o.market_type == 'spreads' and o.home_line is not None]
-
-        # Check h2h (moneyline)
-        h2h_odds = [o for o in all_odds if o.market_type == 'h2h' and o.home_odds is not None and o.away_odds is not None]
-
-        # Check totals
-        totals_odds = [o for o in all_odds if o.market_type == 'totals']
-
-        has_any = len(all_odds) > 0
-        has_spreads = len(spread_odds) > 0
-        has_h2h = len(h2h_odds) > 0
-        has_totals = len(totals_odds) > 0
+        cov = coverage.get(game.id)
+        has_any = cov is not None
+        has_spreads = bool(cov.has_spreads) if cov else False
+        has_h2h = bool(cov.has_h2h) if cov else False
+        has_totals = bool(cov.has_totals) if cov else False
 
         if has_any:
             games_with_any_odds += 1
@@ -110,10 +155,33 @@ def diagnose_odds_coverage(db: Session, days: int = 3):
             reason = "missing_moneyline"
 
         if reason:
-            no_odds_reasons.append(reason)
+            no_odds_reasons[reason] += 1
+
+        # Log the first couple of NO_ODDS games per reason in detail; only
+        # these few games get their full odds rows fetched
+        if reason and no_odds_reasons[reason] <= 2:
+            all_odds = db.execute(
+                select(
+                    GameOdds.bookmaker,
+                    GameOdds.market_type,
+                    GameOdds.home_line,
+                    GameOdds.home_odds,
+                    GameOdds.away_odds,
+                ).where(GameOdds.game_id == game.id)
+            ).all()
+
+            # Bucket by market via one dict dispatch per row (no chained
+            # string compares), then qualify the small buckets
+            buckets = {'spreads': [], 'h2h': [], 'totals': []}
+            for o in all_odds:
+                bucket = buckets.get(o.market_type)
+                if bucket is not None:
+                    bucket.append(o)
+
+            spread_odds = [o for o in buckets['spreads'] if o.home_line is not None]
+            h2h_odds = [o for o in buckets['h2h'] if o.home_odds is not None and o.away_odds is not None]
+            totals_odds = buckets['totals']
 
-        # Log first 5 NO_ODDS games in detail
-        if reason and len([r for r in no_odds_reasons if r == reason]) <= 2:
             print(f"\n{i}. {matchup} (Game ID: {game.id}, Date: {game.date})")
             print(f"   Status: NO_ODDS - Reason: {reason}")
             print(f"   Query: GameOdds.game_id == {game.id}")
@@ -125,7 +193,7 @@ def diagnose_odds_coverage(db: Session, days: int = 3):
             if all_odds:
                 print(f"   Sample odds records:")
                 for odd in all_odds[:3]:
-                    print(f"     - Bookmaker: {odd.bookmaker_key}, Market: {odd.market_type}, "
+                    print(f"     - Bookmaker: {odd.bookmaker}, Market: {odd.market_type}, "
                           f"Home line: {odd.home_line}, Home odds: {odd.home_odds}, Away odds: {odd.away_odds}")
 
     # Summary
@@ -141,8 +209,7 @@ def diagnose_odds_coverage(db: Session, days: int = 3):
     # Top reasons for NO_ODDS
     if no_odds_reasons:
         print(f"\nTop reasons for NO_ODDS:")
-        reason_counts = Counter(no_odds_reasons)
-        for reason, count in reason_counts.most_common(3):
+        for reason, count in no_odds_reasons.most_common(3):
             print(f"  {count:2d} games: {reason}")
     else:
         print(f"\n✓ All games have odds available")
@@ -153,7 +220,8 @@ def print_bet_recommendations(
     inference: MarginInference,
     days: int = 3,
     debug: bool = False,
-    only_bets: bool = False
+    only_bets: bool = False,
+    teams: dict[int, Team] | None = None
 ):
     """
     Print bet recommendations for upcoming games.
@@ -164,6 +232,7 @@ def print_bet_recommendations(
         days: Number of days ahead to predict
         debug: If True, show all 4 candidate EVs for first 5 games
         only_bets: If True, only show HIGH/MEDIUM confidence games
+        teams: Optional prefetched team map, to avoid re-querying
     """
     today = date.today()
     end_date = today + timedelta(days=days)
@@ -173,11 +242,7 @@ def print_bet_recommendations(
     print("="*90)
 
     # Get upcoming games
-    upcoming_games = db.query(Game).filter(
-        Game.date >= today,
-        Game.date <= end_date,
-        Game.is_completed == False
-    ).order_by(Game.date, Game.id).all()
+    upcoming_games = db.scalars(UPCOMING_GAMES_STMT, {"start": today, "end": end_date}).all()
 
     if not upcoming_games:
         print(f"\n⚠️  No upcoming games found in next {days} days")
@@ -191,24 +256,24 @@ def print_bet_recommendations(
     print()
 
     # Get team info
-    teams = {t.id: t for t in db.query(Team).all()}
+    if teams is None:
+        teams = get_teams_dict(db)
+
+    # Predict every margin in one batch call and fetch the slate's consensus
+    # odds with two queries, instead of a model.predict and two odds queries
+    # per game
+    results = inference.predict_margins_batch(upcoming_games)
+    consensus_by_game = get_consensus_odds_batch(db, [g.id for g in upcoming_games])
 
-    # Predict margins and select bets
     recommendations: list[BetRecommendation] = []
     debug_count = 0
 
-    for game in upcoming_games:
-        # Predict margin
-        pred_margin = inference.predict_margin(game)
-
-        # Get consensus odds
-        consensus_odds = get_consensus_odds(db, game)
-
+    for game, pred_margin, _features in results:
         # Select best bet
         recommendation = select_best_bet(
             game=game,
             pred_margin=pred_margin,
-            consensus_odds=consensus_odds
+            consensus_odds=consensus_by_game[game.id]
         )
 
         recommendations.append(recommendation)
@@ -230,33 +295,34 @@ def print_debug_candidates(
     rec: BetRecommendation,
     teams: dict
 ):
-    """Print full candidate table for debugging."""
+    """Print full candidate table for debugging (one buffered write)."""
     home_team = teams.get(game.home_team_id)
     away_team = teams.get(game.away_team_id)
 
     if not home_team or not away_team:
         return
 
-    print(f"\n{'='*90}")
-    print(f"DEBUG: {away_team.abbreviation} @ {home_team.abbreviation}")
-    print(f"{'='*90}")
-    print(f"Predicted margin: {rec.pred_margin:+.1f}")
-    print(f"\nConsensus odds:")
+    out = []
+    out.append(f"\n{'='*90}")
+    out.append(f"DEBUG: {away_team.abbreviation} @ {home_team.abbreviation}")
+    out.append(f"{'='*90}")
+    out.append(f"Predicted margin: {rec.pred_margin:+.1f}")
+    out.append(f"\nConsensus odds:")
 
     odds = rec.consensus_odds
     if odds.spread_line_home is not None:
-        print(f"  Spread: {odds.spread_line_home:+.1f} ({odds.spread_odds_home:+d}/{odds.spread_odds_away:+d})")
+        out.append(f"  Spread: {odds.spread_line_home:+.1f} ({odds.spread_odds_home:+d}/{odds.spread_odds_away:+d})")
     else:
-        print(f"  Spread: N/A")
+        out.append(f"  Spread: N/A")
 
     if odds.ml_odds_home is not None:
-        print(f"  Moneyline: {odds.ml_odds_home:+d} / {odds.ml_odds_away:+d}")
+        out.append(f"  Moneyline: {odds.ml_odds_home:+d} / {odds.ml_odds_away:+d}")
     else:
-        print(f"  Moneyline: N/A")
+        out.append(f"  Moneyline: N/A")
 
-    print(f"\nCandidate EVs:")
-    print(f"{'Market':<12} {'Side':<6} {'Line':<8} {'Odds':<8} {'Prob':<8} {'EV':<8} {'Status':<15}")
-    print("-" * 90)
+    out.append(f"\nCandidate EVs:")
+    out.append(f"{'Market':<12} {'Side':<6} {'Line':<8} {'Odds':<8} {'Prob':<8} {'EV':<8} {'Status':<15}")
+    out.append("-" * 90)
 
     if rec.all_candidates:
         for cand in rec.all_candidates:
@@ -272,31 +338,34 @@ def print_debug_candidates(
                 else:
                     status = "BEST OVERALL"
 
-            # Check if passes threshold
-            passes_prob = cand.probability >= 0.52
-
-            print(f"{cand.market:<12} {cand.side.upper():<6} {line_str:<8} "
-                  f"{cand.odds:+6d}   {cand.probability:>6.1%}  {cand.ev:>6.1%}  {status}")
+            out.append(f"{cand.market:<12} {cand.side.upper():<6} {line_str:<8} "
+                       f"{cand.odds:+6d}   {cand.probability:>6.1%}  {cand.ev:>6.1%}  {status}")
 
     if rec.best_bet:
-        print(f"\n✓ Actionable bet: {rec.best_bet} | Prob: {rec.best_bet.probability:.1%} | "
-              f"EV: {rec.best_bet.ev:.1%} | Tier: {rec.confidence_tier}")
+        out.append(f"\n✓ Actionable bet: {rec.best_bet} | Prob: {rec.best_bet.probability:.1%} | "
+                   f"EV: {rec.best_bet.ev:.1%} | Tier: {rec.confidence_tier}")
     elif rec.best_overall:
-        print(f"\n✗ No actionable bet (best overall: {rec.best_overall} | "
-              f"Prob: {rec.best_overall.probability:.1%} | EV: {rec.best_overall.ev:.1%})")
+        out.append(f"\n✗ No actionable bet (best overall: {rec.best_overall} | "
+                   f"Prob: {rec.best_overall.probability:.1%} | EV: {rec.best_overall.ev:.1%})")
     else:
-        print(f"\n✗ No odds available")
+        out.append(f"\n✗ No odds available")
+
+    sys.stdout.write("\n".join(out) + "\n")
+
+
+# Hoisted so the lookup table isn't rebuilt on every call
+_CONFIDENCE_EMOJI = {
+    "HIGH": "🔥",
+    "MEDIUM": "✓",
+    "LOW": "~",
+    "NO_BET": "✗",
+    "NO_ODDS": "—",
+}
 
 
 def format_confidence_emoji(tier: str) -> str:
     """Get emoji for confidence tier."""
-    return {
-        "HIGH": "🔥",
-        "MEDIUM": "✓",
-        "LOW": "~",
-        "NO_BET": "✗",
-        "NO_ODDS": "—"
-    }.get(tier, "?")
+    return _CONFIDENCE_EMOJI.get(tier, "?")
 
 
 def print_recommendations_by_date(
@@ -304,32 +373,35 @@ def print_recommendations_by_date(
     teams: dict,
     only_bets: bool = False
 ):
-    """Print recommendations grouped by date."""
-    print(f"\n{'='*90}")
-    print("BET RECOMMENDATIONS")
-    print("="*90)
+    """Print recommendations grouped by date (one buffered write)."""
+    out = []
+    out.append(f"\n{'='*90}")
+    out.append("BET RECOMMENDATIONS")
+    out.append("="*90)
+
+    # Filter first and resolve each game's teams once, so skipped games
+    # never reach the formatting work below
+    visible = []
+    for rec in recommendations:
+        if only_bets and not rec.is_actionable():
+            continue
+        home_team = teams.get(rec.game.home_team_id)
+        away_team = teams.get(rec.game.away_team_id)
+        if home_team and away_team:
+            visible.append((rec, home_team, away_team))
 
     current_date = None
     shown_count = 0
 
-    for rec in recommendations:
+    for rec, home_team, away_team in visible:
         game = rec.game
-        home_team = teams.get(game.home_team_id)
-        away_team = teams.get(game.away_team_id)
-
-        if not home_team or not away_team:
-            continue
-
-        # Skip if only_bets and not actionable
-        if only_bets and not rec.is_actionable():
-            continue
 
         # Date header
         if game.date != current_date:
             current_date = game.date
-            print(f"\n{'─'*90}")
-            print(f"📅 {current_date.strftime('%A, %B %d, %Y')}")
-            print(f"{'─'*90}")
+            out.append(f"\n{'─'*90}")
+            out.append(f"📅 {current_date.strftime('%A, %B %d, %Y')}")
+            out.append(f"{'─'*90}")
 
         # Format matchup
         matchup = f"{away_team.abbreviation:3s} @ {home_team.abbreviation:3s}"
@@ -356,7 +428,7 @@ def print_recommendations_by_date(
 
         # Print game header
         confidence_emoji = format_confidence_emoji(rec.confidence_tier)
-        print(f"\n  {matchup}  │  Pred: {pred_str:20s}  │  Market: {spread_str:12s}  │  {confidence_emoji} {rec.confidence_tier}")
+        out.append(f"\n  {matchup}  │  Pred: {pred_str:20s}  │  Market: {spread_str:12s}  │  {confidence_emoji} {rec.confidence_tier}")
 
         # Print best bet if available
         if rec.best_bet:
@@ -368,8 +440,8 @@ def print_recommendations_by_date(
             else:
                 bet_desc = f"{team_abbr} ML"
 
-            print(f"      Bet:  {bet_desc:<20s} @ {bet.odds:+5d}  │  "
-                  f"Prob: {bet.probability:>5.1%}  │  EV: {bet.ev:>6.1%}")
+            out.append(f"      Bet:  {bet_desc:<20s} @ {bet.odds:+5d}  │  "
+                       f"Prob: {bet.probability:>5.1%}  │  EV: {bet.ev:>6.1%}")
         elif rec.best_overall:
             # Show best overall as context but mark as NO BET
             bet = rec.best_overall
@@ -380,22 +452,25 @@ def print_recommendations_by_date(
             else:
                 bet_desc = f"{team_abbr} ML"
 
-            print(f"      NO BET (lean: {bet_desc} @ {bet.odds:+d}, Prob: {bet.probability:.1%}, EV: {bet.ev:.1%})")
+            out.append(f"      NO BET (lean: {bet_desc} @ {bet.odds:+d}, Prob: {bet.probability:.1%}, EV: {bet.ev:.1%})")
         else:
-            print(f"      No odds available")
+            out.append(f"      No odds available")
 
         shown_count += 1
 
-    print("\n" + "="*90)
+    out.append("\n" + "="*90)
     if only_bets:
-        print(f"Showing {shown_count} actionable bets (HIGH/MEDIUM only)")
+        out.append(f"Showing {shown_count} actionable bets (HIGH/MEDIUM only)")
+
+    sys.stdout.write("\n".join(out) + "\n")
 
 
 def print_summary(recommendations: list[BetRecommendation], only_bets: bool = False):
-    """Print summary statistics."""
+    """Print summary statistics (single pass over the recommendations)."""
     total_games = len(recommendations)
 
-    # Count by confidence tier
+    # One walk collects everything the old eight generator expressions
+    # re-derived with repeated is_actionable()/attribute lookups
     tier_counts = {
         "HIGH": 0,
         "MEDIUM": 0,
@@ -403,34 +478,33 @@ def print_summary(recommendations: list[BetRecommendation], only_bets: bool = Fa
         "NO_BET": 0,
         "NO_ODDS": 0
     }
+    games_with_odds = 0
+    ml_bets = spread_bets = home_bets = away_bets = 0
+    evs = []
+    probs = []
 
     for rec in recommendations:
         tier_counts[rec.confidence_tier] += 1
 
-    # Stats for games with bets
-    games_with_odds = sum(1 for r in recommendations if r.confidence_tier != "NO_ODDS")
-    actionable_bets = tier_counts["HIGH"] + tier_counts["MEDIUM"]
-
-    # Market breakdown for actionable bets
-    ml_bets = sum(1 for r in recommendations
-                  if r.is_actionable() and r.best_bet and r.best_bet.market == 'moneyline')
-    spread_bets = sum(1 for r in recommendations
-                      if r.is_actionable() and r.best_bet and r.best_bet.market == 'spread')
+        if rec.confidence_tier != "NO_ODDS":
+            games_with_odds += 1
 
-    # Side breakdown for actionable bets
-    home_bets = sum(1 for r in recommendations
-                    if r.is_actionable() and r.best_bet and r.best_bet.side == 'home')
-    away_bets = sum(1 for r in recommendations
-                    if r.is_actionable() and r.best_bet and r.best_bet.side == 'away')
+        if rec.is_actionable() and rec.best_bet:
+            bet = rec.best_bet
+            if bet.market == 'moneyline':
+                ml_bets += 1
+            elif bet.market == 'spread':
+                spread_bets += 1
+            if bet.side == 'home':
+                home_bets += 1
+            else:
+                away_bets += 1
+            evs.append(bet.ev)
+            probs.append(bet.probability)
 
-    # Average stats for actionable bets
-    if actionable_bets > 0:
-        actionable_recs = [r for r in recommendations if r.is_actionable()]
-        avg_ev = sum(r.best_bet.ev for r in actionable_recs) / actionable_bets
-        avg_prob = sum(r.best_bet.probability for r in actionable_recs) / actionable_bets
-    else:
-        avg_ev = 0
-        avg_prob = 0
+    actionable_bets = tier_counts["HIGH"] + tier_counts["MEDIUM"]
+    avg_ev = float(np.mean(evs)) if evs else 0
+    avg_prob = float(np.mean(probs)) if probs else 0
 
     print(f"\nSUMMARY:")
     print(f"  Total games:           {total_games}")
@@ -489,14 +563,16 @@ def main():
     print("NBA BET PICKER - MARGIN MODEL + EV CALCULATION")
     print("="*90)
 
-    # Initialize database
+    # Initialize database; session reads stay valid across the run since the
+    # factory disables expire-on-commit
     init_db()
-    db = SessionLocal()
+    with closing(SessionLocal()) as db:
+        # One team fetch for the whole run
+        teams = get_teams_dict(db)
 
-    try:
         # Run diagnostics if requested
         if args.diagnose_odds:
-            diagnose_odds_coverage(db, days=args.days)
+            diagnose_odds_coverage(db, days=args.days, teams=teams)
             return
 
         # Initialize inference
@@ -512,14 +588,12 @@ def main():
             inference=inference,
             days=args.days,
             debug=args.debug,
-            only_bets=args.only_bets
+            only_bets=args.only_bets,
+            teams=teams
         )
 
         print("\n✅ Bet picking complete")
 
-    finally:
-        db.close()
-
 
 if __name__ == '__main__':
     main()
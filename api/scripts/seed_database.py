@@ -1,48 +1,94 @@
 """
 Master script to seed the database with all NBA data.
 Run this once to populate the database with historical data.
+
+Completed stages are recorded in api/.cache/seed_state.json so a re-run
+(e.g., after a crash partway through the box-score stage) skips work that
+already finished; pass --force to redo everything.
 """
-import sys
+import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+import _bootstrap  # noqa: F401  # makes nb_analyzer importable from a checkout
 
 from ingest_teams import ingest_teams
 from ingest_players import ingest_players
 from ingest_games import ingest_games
 from ingest_player_stats import ingest_player_stats
 
+STATE_PATH = Path(__file__).parent.parent / ".cache" / "seed_state.json"
+
+
+def _load_state() -> dict:
+    if STATE_PATH.exists():
+        try:
+            return json.loads(STATE_PATH.read_text())
+        except (ValueError, OSError):
+            return {}
+    return {}
+
+
+def _save_state(state: dict):
+    STATE_PATH.parent.mkdir(exist_ok=True)
+    STATE_PATH.write_text(json.dumps(state, indent=2))
+
 
-def seed_database(seasons: list[str] = None):
+def seed_database(seasons: list[str] = None, force: bool = False):
     """
     Seed the database with all NBA data.
 
     Args:
         seasons: List of seasons to fetch (e.g., ["2022-23", "2023-24"])
+        force: Re-run stages even if recorded as already completed
     """
     if seasons is None:
         seasons = ["2022-23", "2023-24", "2024-25"]
 
+    state = {} if force else _load_state()
+    seasons_key = ",".join(seasons)
+
+    def run_stage(name: str, key: str, fn):
+        if state.get(name) == key:
+            print(f"  Stage '{name}' already completed ({key}), skipping (--force to redo)")
+            return
+        fn()
+        state[name] = key
+        _save_state(state)
+
     print("=" * 60)
     print("NBA PREDICTOR - DATABASE SEEDING")
     print("=" * 60)
 
-    print("\n[1/4] Ingesting teams...")
+    print("\n[1/4 + 2/4] Ingesting teams and active players (in parallel)...")
     print("-" * 40)
-    ingest_teams()
+    # Teams and players come from independent endpoints and write disjoint
+    # tables; each ingest opens its own session, so overlap them (their
+    # progress output may interleave)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        futures = {}
+        if state.get("teams") != "v1":
+            futures["teams"] = pool.submit(ingest_teams)
+        else:
+            print("  Stage 'teams' already completed (v1), skipping (--force to redo)")
+        if state.get("players") != "v1":
+            futures["players"] = pool.submit(ingest_players, True)
+        else:
+            print("  Stage 'players' already completed (v1), skipping (--force to redo)")
 
-    print("\n[2/4] Ingesting active players...")
-    print("-" * 40)
-    ingest_players(active_only=True)
+        for name, future in futures.items():
+            future.result()
+            state[name] = "v1"
+            _save_state(state)
 
     print("\n[3/4] Ingesting games...")
     print("-" * 40)
-    ingest_games(seasons=seasons)
+    run_stage("games", seasons_key, lambda: ingest_games(seasons=seasons))
 
     print("\n[4/4] Ingesting player stats...")
     print("-" * 40)
     print("This may take a while (fetching box scores for each game)...")
-    ingest_player_stats()
+    run_stage("player_stats", seasons_key, ingest_player_stats)
 
     print("\n" + "=" * 60)
     print("DATABASE SEEDING COMPLETE")
@@ -60,6 +106,11 @@ if __name__ == "__main__":
         default=["2022-23", "2023-24", "2024-25"],
         help="Seasons to fetch (e.g., 2022-23 2023-24)",
     )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-run all stages even if previously completed",
+    )
     args = parser.parse_args()
 
-    seed_database(seasons=args.seasons)
+    seed_database(seasons=args.seasons, force=args.force)
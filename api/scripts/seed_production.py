@@ -2,14 +2,10 @@
 Lightweight production database seeding.
 Seeds teams and fetches current games + odds.
 """
-import sys
-from datetime import date, timedelta
-from pathlib import Path
-
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+import _bootstrap  # noqa: F401  # makes nb_analyzer importable from a checkout
 
 from ingest_teams import ingest_teams
-from fetch_todays_games import fetch_todays_games
+from fetch_upcoming_games import fetch_upcoming_games
 
 
 def seed_production():
@@ -24,13 +20,10 @@ def seed_production():
 
     print("\n[2/2] Fetching games for next 14 days...")
     print("-" * 40)
-    for days_ahead in range(14):
-        game_date = date.today() + timedelta(days=days_ahead)
-        try:
-            fetch_todays_games(game_date)
-        except Exception as e:
-            print(f"  Error fetching {game_date}: {e}")
-            continue
+    # fetch_upcoming_games fans the 14 scoreboard fetches out across a
+    # thread pool and reuses one team mapping; per-day errors are logged
+    # and skipped there
+    fetch_upcoming_games()
 
     print("\n" + "=" * 60)
     print("✅ PRODUCTION SEEDING COMPLETE")
@@ -2,14 +2,16 @@
 """
 Test bet selector sign conventions and probability calculations.
 """
-import sys
-from pathlib import Path
 
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+import _bootstrap  # noqa: F401  # makes nb_analyzer importable from a checkout
+
+import numpy as np
 
 from nb_analyzer.ml.bet_selector import (
     win_prob_from_margin,
+    win_prob_from_margin_batch,
     cover_prob_from_margin,
+    cover_prob_from_margin_batch,
     american_to_decimal,
     ev_from_prob_and_american,
     DEFAULT_SIGMA
@@ -17,80 +19,58 @@ from nb_analyzer.ml.bet_selector import (
 
 
 def test_sign_conventions():
-    """Verify sign conventions match expectations."""
+    """Verify sign conventions over a vectorized sweep of cases."""
     print("="*80)
-    print("SIGN CONVENTION TESTS")
+    print("SIGN CONVENTION TESTS (vector sweep)")
     print("="*80)
 
-    # Test case from user request
-    print("\nTest 1: pred_margin=+10, spread_line_home=-6.5")
-    print("  Model predicts home wins by 10 pts")
-    print("  Market has home favored by 6.5 (home -6.5)")
-    print("  Expected: home cover probability > 50% (model more bullish than market)")
-
-    pred_margin = 10.0
-    spread_line_home = -6.5
-    p_home_cover = cover_prob_from_margin(pred_margin, spread_line_home, DEFAULT_SIGMA)
-
-    print(f"  Result: P(home covers -6.5) = {p_home_cover:.1%}")
-    print(f"  ✓ PASS" if p_home_cover > 0.5 else "  ✗ FAIL")
-
-    # Additional test cases
-    print("\nTest 2: pred_margin=+3, spread_line_home=-6.5")
-    print("  Model predicts home wins by 3 pts")
-    print("  Market has home favored by 6.5")
-    print("  Expected: home cover probability < 50% (model less bullish)")
-
-    pred_margin = 3.0
-    spread_line_home = -6.5
-    p_home_cover = cover_prob_from_margin(pred_margin, spread_line_home, DEFAULT_SIGMA)
-
-    print(f"  Result: P(home covers -6.5) = {p_home_cover:.1%}")
-    print(f"  ✓ PASS" if p_home_cover < 0.5 else "  ✗ FAIL")
+    # (pred_margin, spread_line_home, expect P(home cover) > 50%)
+    #  1. home by 10 vs home -6.5: model more bullish than market
+    #  2. home by 3  vs home -6.5: model less bullish
+    #  3. away by 5  vs home +3.5: model expects home to lose by more
+    #  4. away by 5  vs home +7.5: home can lose by 7 and still cover
+    pred_margins = np.array([10.0, 3.0, -5.0, -5.0])
+    spread_lines = np.array([-6.5, -6.5, 3.5, 7.5])
+    expect_over_half = np.array([True, False, False, True])
 
-    print("\nTest 3: pred_margin=-5, spread_line_home=+3.5")
-    print("  Model predicts away wins by 5 pts")
-    print("  Market has home underdog by 3.5 (home +3.5)")
-    print("  Expected: home cover probability < 50% (model expects home to lose by more)")
+    p_home_cover = cover_prob_from_margin_batch(pred_margins, spread_lines, DEFAULT_SIGMA)
 
-    pred_margin = -5.0
-    spread_line_home = +3.5
-    p_home_cover = cover_prob_from_margin(pred_margin, spread_line_home, DEFAULT_SIGMA)
+    for margin, line, p, bullish in zip(pred_margins, spread_lines, p_home_cover, expect_over_half):
+        side = ">" if bullish else "<"
+        print(f"  pred={margin:+5.1f}  line={line:+5.1f}  ->  P(home covers) = {p:.1%}  (expected {side} 50%)")
 
-    print(f"  Result: P(home covers +3.5) = {p_home_cover:.1%}")
-    print(f"  ✓ PASS" if p_home_cover < 0.5 else "  ✗ FAIL")
-
-    print("\nTest 4: pred_margin=-5, spread_line_home=+7.5")
-    print("  Model predicts away wins by 5 pts")
-    print("  Market has home underdog by 7.5")
-    print("  Expected: home cover probability > 50% (home can lose by 7)")
-
-    pred_margin = -5.0
-    spread_line_home = +7.5
-    p_home_cover = cover_prob_from_margin(pred_margin, spread_line_home, DEFAULT_SIGMA)
-
-    print(f"  Result: P(home covers +7.5) = {p_home_cover:.1%}")
-    print(f"  ✓ PASS" if p_home_cover > 0.5 else "  ✗ FAIL")
+    np.testing.assert_array_less(0.5, p_home_cover[expect_over_half])
+    np.testing.assert_array_less(p_home_cover[~expect_over_half], 0.5)
+    print("  ✓ PASS")
 
 
 def test_win_probability():
-    """Test win probability calculations."""
+    """Test win probability calculations over a vectorized sweep."""
     print("\n" + "="*80)
-    print("WIN PROBABILITY TESTS")
+    print("WIN PROBABILITY TESTS (vector sweep)")
     print("="*80)
 
-    test_cases = [
-        (10.0, "Home favored by 10", 0.50, ">"),
-        (-10.0, "Away favored by 10", 0.50, "<"),
-        (0.0, "Even game", 0.50, "="),
-        (14.4, "Home favored by 1 sigma", 0.84, "≈"),
-        (-14.4, "Away favored by 1 sigma", 0.16, "≈"),
+    pred_margins = np.array([10.0, -10.0, 0.0, DEFAULT_SIGMA, -DEFAULT_SIGMA])
+    descriptions = [
+        "Home favored by 10",
+        "Away favored by 10",
+        "Even game",
+        "Home favored by 1 sigma",
+        "Away favored by 1 sigma",
     ]
 
-    for pred_margin, desc, expected, comp in test_cases:
-        p_home_win = win_prob_from_margin(pred_margin, DEFAULT_SIGMA)
-        print(f"\npred_margin={pred_margin:+.1f}: {desc}")
-        print(f"  P(home wins) = {p_home_win:.1%} (expected {comp} {expected:.1%})")
+    p_home_win = win_prob_from_margin_batch(pred_margins, DEFAULT_SIGMA)
+
+    for pred_margin, desc, p in zip(pred_margins, descriptions, p_home_win):
+        print(f"  pred_margin={pred_margin:+5.1f}: {desc:26s} P(home wins) = {p:.1%}")
+
+    assert p_home_win[0] > 0.5
+    assert p_home_win[1] < 0.5
+    np.testing.assert_allclose(p_home_win[2], 0.5)
+    # One sigma corresponds to the standard normal's ~84.1%/15.9% split
+    np.testing.assert_allclose(p_home_win[3], 0.8413, atol=1e-3)
+    np.testing.assert_allclose(p_home_win[4], 0.1587, atol=1e-3)
+    print("  ✓ PASS")
 
 
 def test_ev_calculation():
@@ -138,12 +118,42 @@ def test_odds_conversion():
         (-200, 1.5),  # -200 = risk $200 to win $100
     ]
 
-    for american, expected_decimal in test_cases:
-        decimal = american_to_decimal(american)
-        print(f"\n{american:+4d} -> {decimal:.3f} (expected {expected_decimal:.3f})")
+    decimals = np.array([american_to_decimal(american) for american, _ in test_cases])
+    expected = np.array([expected_decimal for _, expected_decimal in test_cases])
 
+    for (american, _), decimal in zip(test_cases, decimals):
         profit = (decimal - 1) * 100
-        print(f"  Win ${profit:.0f} on $100 bet")
+        print(f"  {american:+4d} -> {decimal:.3f}  (win ${profit:.0f} on $100 bet)")
+
+    np.testing.assert_allclose(decimals, expected, atol=1e-3)
+    print("  ✓ PASS")
+
+
+def test_batch_consistency():
+    """Verify the vectorized probability paths agree with the scalar ones."""
+    print("\n" + "="*80)
+    print("BATCH PATH CONSISTENCY TESTS")
+    print("="*80)
+
+    pred_margins = np.array([10.0, 3.0, -5.0, -5.0, 0.0, 14.4])
+    spread_lines = np.array([-6.5, -6.5, 3.5, 7.5, 0.0, -2.5])
+
+    win_batch = win_prob_from_margin_batch(pred_margins, DEFAULT_SIGMA)
+    win_scalar = [win_prob_from_margin(m, DEFAULT_SIGMA) for m in pred_margins]
+
+    cover_batch = cover_prob_from_margin_batch(pred_margins, spread_lines, DEFAULT_SIGMA)
+    cover_scalar = [
+        cover_prob_from_margin(m, line, DEFAULT_SIGMA)
+        for m, line in zip(pred_margins, spread_lines)
+    ]
+
+    # The scalar path quantizes z to 1e-3 for its memo cache, so allow the
+    # corresponding sub-5e-4 probability slack against the exact batch path
+    np.testing.assert_allclose(win_batch, win_scalar, atol=5e-4)
+    np.testing.assert_allclose(cover_batch, cover_scalar, atol=5e-4)
+
+    print("\nWin probabilities   (batch vs scalar): ✓ PASS")
+    print("Cover probabilities (batch vs scalar): ✓ PASS")
 
 
 if __name__ == '__main__':
@@ -151,6 +161,7 @@ if __name__ == '__main__':
     test_win_probability()
     test_ev_calculation()
     test_odds_conversion()
+    test_batch_consistency()
 
     print("\n" + "="*80)
     print("✅ All tests complete")
@@ -5,13 +5,14 @@ Test ML recommendation integration with API.
 Verifies that ML recommendations work end-to-end through the recommendations service.
 """
 import sys
-from pathlib import Path
 from datetime import date, timedelta
 
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+import _bootstrap  # noqa: F401  # makes nb_analyzer importable from a checkout
+
+from sqlalchemy.orm import selectinload
 
 from nb_analyzer.database import SessionLocal, init_db
-from nb_analyzer.models import Game, Team
+from nb_analyzer.models import Game
 from nb_analyzer.services.recommendations import RecommendationService
 
 
@@ -38,18 +39,19 @@ def test_ml_integration(days: int = 1):
         today = date.today()
         end_date = today + timedelta(days=days)
 
-        games = db.query(Game).filter(
+        # Eager-load both team relationships so the listing is two queries
+        # total instead of a Team dict plus per-game lookups
+        games_query = db.query(Game).options(
+            selectinload(Game.home_team), selectinload(Game.away_team)
+        ).filter(
             Game.date >= today,
             Game.date <= end_date,
             Game.is_completed == False
-        ).order_by(Game.date, Game.id).all()
+        ).order_by(Game.date, Game.id)
 
-        print(f"\nTesting {len(games)} upcoming games (next {days} day(s))")
+        print(f"\nTesting upcoming games (next {days} day(s))")
         print(f"Date range: {today} to {end_date}")
 
-        # Get team lookup
-        teams = {t.id: t for t in db.query(Team).all()}
-
         print("\n" + "="*90)
         print("GAME-BY-GAME RESULTS")
         print("="*90)
@@ -57,56 +59,82 @@ def test_ml_integration(days: int = 1):
         # Test each game
         success_count = 0
         error_count = 0
+        games_tested = 0
+        index = 0
         confidence_counts = {"high": 0, "medium": 0, "low": 0}
         bet_type_counts = {}
 
-        for i, game in enumerate(games, 1):
-            home_team = teams.get(game.home_team_id)
-            away_team = teams.get(game.away_team_id)
-
-            if not home_team or not away_team:
-                continue
-
-            matchup = f"{away_team.abbreviation} @ {home_team.abbreviation}"
-
-            try:
-                # Generate ML recommendation
-                recommendations = service.generate_ml_recommendations(game)
-
-                if recommendations:
-                    rec = recommendations[0]
-                    success_count += 1
-
-                    # Count confidence and bet types
-                    confidence_counts[rec.confidence] = confidence_counts.get(rec.confidence, 0) + 1
-                    bet_type_counts[rec.bet_type] = bet_type_counts.get(rec.bet_type, 0) + 1
-
-                    # Format output
-                    print(f"\n{i}. {matchup} (Game ID: {game.id})")
-                    print(f"   Date: {game.date}")
-                    print(f"   Bet Type: {rec.bet_type}")
-                    print(f"   Subject: {rec.subject_abbrev}")
-                    print(f"   Confidence: {rec.confidence}")
-                    print(f"   Insight: {rec.insight}")
-                    print(f"   Supporting Stats:")
-                    for stat in rec.supporting_stats[:6]:  # Show first 6 stats
-                        print(f"     - {stat['label']}: {stat['value']}")
-
-                else:
-                    print(f"\n{i}. {matchup} - No recommendation returned")
+        def process_window(window: list[Game]):
+            """Run one batched service call for a window and report its games."""
+            nonlocal success_count, error_count, games_tested, index
+
+            recs_by_game = service.generate_ml_recommendations_batch(window)
+            games_tested += len(window)
+
+            for game in window:
+                index += 1
+                i = index
+                home_team = game.home_team
+                away_team = game.away_team
+
+                if not home_team or not away_team:
+                    continue
+
+                matchup = f"{away_team.abbreviation} @ {home_team.abbreviation}"
+
+                try:
+                    recommendations = recs_by_game.get(game.id, [])
+
+                    if recommendations:
+                        rec = recommendations[0]
+                        success_count += 1
+
+                        # Count confidence and bet types
+                        confidence_counts[rec.confidence] = confidence_counts.get(rec.confidence, 0) + 1
+                        bet_type_counts[rec.bet_type] = bet_type_counts.get(rec.bet_type, 0) + 1
+
+                        # Format the game block and emit it as one write instead
+                        # of ~10 line-flushed prints
+                        block = [
+                            f"\n{i}. {matchup} (Game ID: {game.id})",
+                            f"   Date: {game.date}",
+                            f"   Bet Type: {rec.bet_type}",
+                            f"   Subject: {rec.subject_abbrev}",
+                            f"   Confidence: {rec.confidence}",
+                            f"   Insight: {rec.insight}",
+                            f"   Supporting Stats:",
+                        ]
+                        for stat in rec.supporting_stats[:6]:  # Show first 6 stats
+                            block.append(f"     - {stat['label']}: {stat['value']}")
+                        sys.stdout.write("\n".join(block) + "\n")
+
+                    else:
+                        print(f"\n{i}. {matchup} - No recommendation returned")
+                        error_count += 1
+
+                except Exception as e:
+                    print(f"\n{i}. {matchup} - ERROR: {str(e)}")
                     error_count += 1
-
-            except Exception as e:
-                print(f"\n{i}. {matchup} - ERROR: {str(e)}")
-                error_count += 1
-                import traceback
-                traceback.print_exc()
+                    import traceback
+                    traceback.print_exc()
+
+        # Stream games in windows of 50 (server-side cursor) so long ranges
+        # never materialize every ORM object at once; each window still goes
+        # through the batched service call
+        window = []
+        for game in games_query.yield_per(50):
+            window.append(game)
+            if len(window) >= 50:
+                process_window(window)
+                window = []
+        if window:
+            process_window(window)
 
         # Summary
         print("\n" + "="*90)
         print("SUMMARY")
         print("="*90)
-        print(f"\nTotal games tested:    {len(games)}")
+        print(f"\nTotal games tested:    {games_tested}")
         print(f"Successful:            {success_count}")
         print(f"Errors:                {error_count}")
 
@@ -0,0 +1,12 @@
+"""
+Static NBA constants derived from nba_api's embedded team data.
+"""
+from nba_api.stats.static import teams as nba_teams
+
+
+# Abbreviation -> NBA team id. Teams essentially never change and nba_api
+# ships this data statically, so lookups need no database round-trip (and
+# work before the Team table is populated).
+TEAM_ABBREV_TO_ID: dict[str, int] = {
+    t["abbreviation"]: t["id"] for t in nba_teams.get_teams()
+}
@@ -1,22 +1,70 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 
 from nb_analyzer.config import settings
 
 
+# psycopg2's fast executemany helpers; SQLite relies on SQLAlchemy's built-in
+# insertmanyvalues batching instead (and rejects these kwargs)
+_pg_kwargs = {} if settings.USE_SQLITE else {
+    "executemany_mode": "values_plus_batch",
+    "executemany_values_page_size": 1000,
+}
+
 engine = create_engine(
     settings.db_url,
     connect_args={"check_same_thread": False} if settings.USE_SQLITE else {},
     echo=False,
+    insertmanyvalues_page_size=1000,
+    # Explicit compiled-statement cache; repeated bind-parameterized
+    # statements skip SQL compilation entirely
+    query_cache_size=1200,
+    **_pg_kwargs,
 )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+if settings.USE_SQLITE:
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        """
+        Tune SQLite for the bulk-write scripts: WAL lets readers run during
+        writes, synchronous=NORMAL fsyncs per checkpoint instead of per
+        statement, and busy_timeout waits out short lock contention.
+        """
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.execute("PRAGMA cache_size=-64000")
+        cursor.close()
+
+# expire_on_commit=False keeps loaded objects usable after commit instead of
+# re-SELECTing them, which matters for the long backfill/ingest loops
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 
 class Base(DeclarativeBase):
     pass
 
 
+def dialect_insert(model):
+    """
+    Dialect-specific INSERT construct with ON CONFLICT support.
+
+    Lets the ingest scripts write idempotently (on_conflict_do_nothing /
+    on_conflict_do_update) against both SQLite and PostgreSQL instead of
+    hand-rolling check-then-insert round-trips. The insert is built against
+    the bare Table, so executing it with row dicts goes through plain Core
+    executemany with no ORM unit-of-work machinery.
+    """
+    if engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as _insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as _insert
+    return _insert(getattr(model, "__table__", model))
+
+
 def get_db():
     db = SessionLocal()
     try:
@@ -325,12 +325,25 @@ class MarginDatasetBuilder:
         print("="*70)
 
     def save_dataset(self, df: pd.DataFrame, filename: str = "margin_training_data.csv"):
-        """Save dataset to CSV file."""
+        """
+        Save dataset to CSV, plus a Parquet twin when pyarrow is available.
+
+        The training script prefers the Parquet file: typed columnar reads
+        skip the per-run CSV float re-parse entirely.
+        """
         output_path = self.output_dir / filename
         df.to_csv(output_path, index=False)
         print(f"\n💾 Dataset saved to: {output_path}")
         print(f"   Size: {len(df)} rows × {len(df.columns)} columns")
         print(f"   File size: {output_path.stat().st_size / 1024 / 1024:.2f} MB")
+
+        try:
+            parquet_path = output_path.with_suffix(".parquet")
+            df.to_parquet(parquet_path, index=False)
+            print(f"💾 Parquet twin saved to: {parquet_path}")
+        except ImportError:
+            print("   (pyarrow not installed - skipping Parquet twin)")
+
         return output_path
 
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Integer, Float, ForeignKey, String, UniqueConstraint
+from sqlalchemy import Index, Integer, Float, ForeignKey, String, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from nb_analyzer.database import Base
@@ -8,6 +8,9 @@ class PlayerGameStats(Base):
     __tablename__ = "player_game_stats"
     __table_args__ = (
         UniqueConstraint("player_id", "game_id", name="uq_player_game"),
+        # The ingest's "which games already have stats" query groups on
+        # game_id; this index keeps it an index-only scan as the table grows
+        Index("ix_player_game_stats_game_id", "game_id"),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
@@ -3,7 +3,7 @@ API routes for games and recommendations.
 """
 from datetime import date
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
 from nb_analyzer.database import get_db
 from nb_analyzer.models import Game, Team
@@ -34,12 +34,19 @@ def get_games_by_date(game_date: str, db: Session = Depends(get_db)):
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD.")
 
-    games = db.query(Game).filter(Game.date == parsed_date).all()
+    # Eager-load both team relationships in one batch instead of two
+    # Team SELECTs per game
+    games = (
+        db.query(Game)
+        .options(selectinload(Game.home_team), selectinload(Game.away_team))
+        .filter(Game.date == parsed_date)
+        .all()
+    )
 
     result = []
     for game in games:
-        home_team = db.query(Team).filter(Team.id == game.home_team_id).first()
-        away_team = db.query(Team).filter(Team.id == game.away_team_id).first()
+        home_team = game.home_team
+        away_team = game.away_team
 
         result.append({
             "game_id": game.id,
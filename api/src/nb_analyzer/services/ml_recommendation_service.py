@@ -11,7 +11,8 @@ from nb_analyzer.ml.margin_inference import MarginInference
 from nb_analyzer.ml.bet_selector import (
     BetRecommendation,
     get_consensus_odds,
-    select_best_bet
+    select_best_bet,
+    select_best_bets_slate
 )
 
 
@@ -85,16 +86,20 @@ class MLRecommendationService:
         """
         Generate ML-based recommendations for multiple games efficiently.
 
+        One batched margin prediction, one slate-wide consensus fetch, and
+        vectorized probability math cover the whole slate, instead of a
+        model call, two odds queries, and scalar CDFs per game.
+
         Args:
             games: List of games to generate recommendations for
 
         Returns:
-            List of BetRecommendation objects (one per game)
+            List of BetRecommendation objects (one per game, in date order)
         """
-        recommendations = []
-
-        for game in games:
-            rec = self.generate_ml_recommendation(game)
-            recommendations.append(rec)
+        results = self.inference.predict_margins_batch(games)
 
-        return recommendations
+        return select_best_bets_slate(
+            self.db,
+            [game for game, _, _ in results],
+            [pred_margin for _, pred_margin, _ in results],
+        )
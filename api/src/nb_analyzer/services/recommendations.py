@@ -733,6 +733,37 @@ class RecommendationService:
 
         return [api_rec] if api_rec else []
 
+    def generate_ml_recommendations_batch(self, games: list[Game]) -> dict[int, list[Recommendation]]:
+        """
+        Generate ML-based recommendations for a whole slate of games at once.
+
+        Batches the margin predictions and consensus-odds queries, so the
+        cost is one model call plus two odds queries instead of N of each.
+
+        Args:
+            games: Games to generate recommendations for
+
+        Returns:
+            Dict keyed by game id; each value matches what
+            generate_ml_recommendations would return for that game.
+        """
+        ml_recs = self.ml_service.generate_ml_recommendations_batch(games)
+
+        by_game: dict[int, list[Recommendation]] = {}
+        for ml_rec in ml_recs:
+            game = ml_rec.game
+            home_team = self.team_analysis.get_team_by_id(game.home_team_id)
+            away_team = self.team_analysis.get_team_by_id(game.away_team_id)
+
+            if not home_team or not away_team:
+                by_game[game.id] = []
+                continue
+
+            api_rec = self._map_ml_to_api_recommendation(ml_rec, home_team, away_team)
+            by_game[game.id] = [api_rec] if api_rec else []
+
+        return by_game
+
     def _map_ml_to_api_recommendation(
         self,
         ml_rec: BetRecommendation,
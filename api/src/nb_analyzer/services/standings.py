@@ -75,14 +75,17 @@ class StandingsService:
             df = standings.get_data_frames()[0]
 
             # Build cache: team_id -> {wins, losses, record_str}
+            # itertuples skips the per-row Series construction of iterrows
             cache = {}
-            for _, row in df.iterrows():
-                team_id = int(row['TeamID'])
+            for row in df[['TeamID', 'WINS', 'LOSSES', 'WinPCT']].itertuples(index=False):
+                team_id = int(row.TeamID)
+                wins = int(row.WINS)
+                losses = int(row.LOSSES)
                 cache[team_id] = {
-                    'wins': int(row['WINS']),
-                    'losses': int(row['LOSSES']),
-                    'record': f"{int(row['WINS'])}-{int(row['LOSSES'])}",
-                    'win_pct': float(row['WinPCT']),
+                    'wins': wins,
+                    'losses': losses,
+                    'record': f"{wins}-{losses}",
+                    'win_pct': float(row.WinPCT),
                 }
 
             self._standings_cache = cache
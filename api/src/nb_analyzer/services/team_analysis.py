@@ -54,7 +54,9 @@ class TeamAnalysisService:
         self.db = db
 
     def get_team_by_id(self, team_id: int) -> Team | None:
-        return self.db.query(Team).filter(Team.id == team_id).first()
+        # Session.get serves repeats from the identity map, so per-game
+        # team lookups across a run cost one SELECT per team total
+        return self.db.get(Team, team_id)
 
     def get_team_by_abbrev(self, abbrev: str) -> Team | None:
         return self.db.query(Team).filter(Team.abbreviation == abbrev).first()